@@ -1,6 +1,13 @@
 from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+import io
+import json
 import os
+import shutil
 import uuid
+import zipfile
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 from datetime import datetime
 from werkzeug.utils import secure_filename
@@ -8,7 +15,7 @@ from src.document_processor import DocumentProcessor
 from src.validator import DocumentValidator
 from src.corrector import DocumentCorrector
 from src.report_generator import ReportGenerator
-from src.document_restructurer import DocumentRestructurer
+from src.document_restructurer import DocumentRestructurer, serialize_analysis
 
 app = Flask(__name__)
 app.secret_key = 'unismuh-thesis-formatter-secret-key'
@@ -16,19 +23,199 @@ app.secret_key = 'unismuh-thesis-formatter-secret-key'
 # Configuration
 UPLOAD_FOLDER = 'temp'
 ALLOWED_EXTENSIONS = {'docx'}
+DOCX_MAGIC = b'PK\x03\x04'  # .docx files are zip packages
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
 
+# Ensure temp directory exists and configure logging once per process
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(os.path.join(UPLOAD_FOLDER, 'processing.log')),
+        logging.StreamHandler()
+    ]
+)
+
+# In-memory index of uploaded documents:
+# file_id -> {'original': path, 'filename': name, 'backup': path, 'corrected': path, 'restructured': path}
+FILE_INDEX = {}
+FILE_INDEX_LOCK = threading.Lock()
+
+# Files written alongside an upload, keyed by the name that follows "<file_id>_"
+DERIVED_FILE_KINDS = {
+    'backup.docx': 'backup',
+    'corrected.docx': 'corrected',
+    'restructured.docx': 'restructured',
+    'status.json': 'status'
+}
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+CONFIG_PATH = 'config/formatting_rules.yaml'
+_config_cache = {}
+
+# Processing components built from the current config: class -> (config, instance)
+_component_cache = {}
+_component_lock = threading.Lock()
+
 def load_config():
-    """Load formatting rules from YAML configuration"""
-    with open('config/formatting_rules.yaml', 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    """Load formatting rules from YAML configuration (cached until the file changes)"""
+    mtime = os.path.getmtime(CONFIG_PATH)
+    cached = _config_cache.get(CONFIG_PATH)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=YAML_LOADER)
+
+    _config_cache[CONFIG_PATH] = (mtime, config)
+    with _component_lock:
+        _component_cache.clear()
+    return config
+
+def get_component(component_class, config):
+    """Return a shared component instance (validator, corrector, ...) for the config"""
+    with _component_lock:
+        cached = _component_cache.get(component_class)
+        if cached and cached[0] is config:
+            return cached[1]
+
+        component = component_class(config)
+        _component_cache[component_class] = (config, component)
+        return component
+
+def is_docx_upload(file):
+    """Check that an upload is a zip package with [Content_Types].xml, without saving it"""
+    stream = file.stream
+    try:
+        if stream.read(len(DOCX_MAGIC)) != DOCX_MAGIC:
+            return False
+
+        stream.seek(0)
+        with zipfile.ZipFile(stream) as package:
+            package.getinfo('[Content_Types].xml')
+        return True
+
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return False
+
+    finally:
+        stream.seek(0)
+
+def save_upload(file, path, size_hint):
+    """Stream an uploaded file to disk, preallocating space for it first"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with os.fdopen(fd, 'wb') as out:
+        if size_hint and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size_hint)
+            except OSError:
+                pass  # Filesystem does not support preallocation
+
+        shutil.copyfileobj(file.stream, out, 1024 * 1024)
+
+        # The request length includes multipart overhead; drop the unused tail
+        out.truncate()
+
+def _index_upload_file(folder, name):
+    """Add one "<uuid4>_<name>" file to the index; the caller holds FILE_INDEX_LOCK"""
+    file_id, separator, remainder = name.partition('_')
+    if not separator or len(file_id) != 36:  # Not a "<uuid4>_<name>" file
+        return
+
+    entry = FILE_INDEX.setdefault(file_id, {})
+    path = os.path.join(folder, name)
+    kind = DERIVED_FILE_KINDS.get(remainder)
+    if kind:
+        entry[kind] = path
+    else:
+        entry['original'] = path
+        entry['filename'] = remainder
+
+def build_file_index(folder):
+    """Populate the file index from documents already present in the upload folder"""
+    if not os.path.isdir(folder):
+        return
+
+    with FILE_INDEX_LOCK:
+        for name in os.listdir(folder):
+            _index_upload_file(folder, name)
+
+def register_file(file_id, **paths):
+    """Record paths belonging to an uploaded document"""
+    with FILE_INDEX_LOCK:
+        FILE_INDEX.setdefault(file_id, {}).update(paths)
+
+def get_file_entry(file_id):
+    """Return a snapshot of the indexed paths for a document, or None"""
+    with FILE_INDEX_LOCK:
+        entry = FILE_INDEX.get(file_id)
+        if entry:
+            return dict(entry)
+
+    # Another worker process may have written the upload; look on disk once
+    folder = app.config['UPLOAD_FOLDER']
+    try:
+        names = [f for f in os.listdir(folder) if f.startswith(f"{file_id}_")]
+    except OSError:
+        return None
+
+    with FILE_INDEX_LOCK:
+        for name in names:
+            _index_upload_file(folder, name)
+        entry = FILE_INDEX.get(file_id)
+        return dict(entry) if entry else None
+
+def find_document(file_id):
+    """Return the path of the uploaded document for file_id, or None"""
+    entry = get_file_entry(file_id)
+    return entry.get('original') if entry else None
+
+build_file_index(UPLOAD_FOLDER)
+
+# Background document processing; each job's outcome is written next to the
+# upload as "<file_id>_status.json" so any worker process can report it
+EXECUTOR = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
+
+def write_job_status(file_id, job_status):
+    """Persist the processing status of an upload and index the status file"""
+    path = os.path.join(UPLOAD_FOLDER, f"{file_id}_status.json")
+    # The temporary name does not start with the file_id, so it is never indexed
+    tmp_path = os.path.join(UPLOAD_FOLDER, f".{file_id}_status.json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(job_status, f, default=str)
+    os.replace(tmp_path, path)
+    register_file(file_id, status=path)
+
+def read_job_status(path):
+    """Load a persisted processing status, or None if it cannot be read"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def process_upload(config, original_path, file_id):
+    """Process an uploaded document in the background and record its outcome"""
+    try:
+        processor = get_component(DocumentProcessor, config)
+        processing_result = processor.process_document(original_path, file_id)
+        register_file(file_id, backup=processing_result['backup_created'])
+    except Exception as e:
+        write_job_status(file_id, {'status': 'failed', 'error': f'Processing failed: {str(e)}'})
+        raise
+
+    write_job_status(file_id, {'status': 'completed', 'result': processing_result})
+    return processing_result
 
 @app.route('/')
 def index():
@@ -38,6 +225,10 @@ def index():
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """Handle document upload and processing"""
+    # Reject oversized bodies before werkzeug parses and spools the form
+    if request.content_length and request.content_length > MAX_FILE_SIZE:
+        return too_large(None)
+
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file selected'}), 400
@@ -49,26 +240,30 @@ def upload_file():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Only .docx files are allowed'}), 400
 
+        if not is_docx_upload(file):
+            return jsonify({'error': 'File is not a valid .docx document'}), 400
+
         # Generate unique filename
         file_id = str(uuid.uuid4())
         filename = secure_filename(file.filename)
         original_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_{filename}")
 
         # Save uploaded file
-        file.save(original_path)
+        save_upload(file, original_path, request.content_length)
+        register_file(file_id, original=original_path, filename=filename)
 
         # Load configuration
         config = load_config()
 
-        # Process document
-        processor = DocumentProcessor(config)
-        processing_result = processor.process_document(original_path, file_id)
+        # Process document in the background; clients poll /status/<file_id>
+        write_job_status(file_id, {'status': 'processing'})
+        EXECUTOR.submit(process_upload, config, original_path, file_id)
 
         return jsonify({
             'success': True,
             'file_id': file_id,
             'filename': filename,
-            'result': processing_result
+            'status': 'processing'
         })
 
     except Exception as e:
@@ -81,14 +276,12 @@ def validate_document(file_id):
         config = load_config()
 
         # Find the document file
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-        if not files:
+        doc_path = find_document(file_id)
+        if not doc_path:
             return jsonify({'error': 'Document not found'}), 404
 
-        doc_path = os.path.join(app.config['UPLOAD_FOLDER'], files[0])
-
         # Validate document
-        validator = DocumentValidator(config)
+        validator = get_component(DocumentValidator, config)
         violations = validator.validate_document(doc_path)
 
         return jsonify({
@@ -108,18 +301,18 @@ def correct_document(file_id):
         config = load_config()
 
         # Find the document file
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-        if not files:
+        doc_path = find_document(file_id)
+        if not doc_path:
             return jsonify({'error': 'Document not found'}), 404
 
-        doc_path = os.path.join(app.config['UPLOAD_FOLDER'], files[0])
-
         # Get correction options from request
         corrections_to_apply = request.json.get('corrections', [])
 
         # Apply corrections
-        corrector = DocumentCorrector(config)
+        corrector = get_component(DocumentCorrector, config)
         correction_result = corrector.apply_corrections(doc_path, corrections_to_apply)
+        if correction_result['corrected_file_path']:
+            register_file(file_id, corrected=correction_result['corrected_file_path'])
 
         return jsonify({
             'success': True,
@@ -138,20 +331,20 @@ def restructure_document(file_id):
         config = load_config()
 
         # Find the document file
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-        if not files:
+        doc_path = find_document(file_id)
+        if not doc_path:
             return jsonify({'error': 'Document not found'}), 404
 
-        doc_path = os.path.join(app.config['UPLOAD_FOLDER'], files[0])
-
         # Initialize restructurer
-        restructurer = DocumentRestructurer(config)
+        restructurer = get_component(DocumentRestructurer, config)
 
         # Get restructuring options from request (default to auto-restructure)
         restructure_options = request.json.get('options', {'reorder_chapters': True})
 
         # Apply restructuring
         result = restructurer.restructure_document(doc_path, restructure_options)
+        if result['restructured_file_path']:
+            register_file(file_id, restructured=result['restructured_file_path'])
 
         return jsonify({
             'success': result['success'],
@@ -172,17 +365,17 @@ def preview_restructure(file_id):
         config = load_config()
 
         # Find the document file
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-        if not files:
+        doc_path = find_document(file_id)
+        if not doc_path:
             return jsonify({'error': 'Document not found'}), 404
 
-        doc_path = os.path.join(app.config['UPLOAD_FOLDER'], files[0])
-
         # Initialize restructurer
-        restructurer = DocumentRestructurer(config)
+        restructurer = get_component(DocumentRestructurer, config)
 
-        # Get preview
+        # Get preview; the analysis holds dataclasses, so convert it for JSON
         preview = restructurer.get_restructuring_preview(doc_path)
+        if 'analysis' in preview:
+            preview = {**preview, 'analysis': serialize_analysis(preview['analysis'])}
 
         return jsonify({
             'success': True,
@@ -199,17 +392,17 @@ def generate_report(file_id):
         config = load_config()
 
         # Find the document file
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-        if not files:
+        doc_path = find_document(file_id)
+        if not doc_path:
             return jsonify({'error': 'Document not found'}), 404
 
-        doc_path = os.path.join(app.config['UPLOAD_FOLDER'], files[0])
-
-        # Generate report
-        report_generator = ReportGenerator(config)
-        report_path = report_generator.generate_pdf_report(doc_path, file_id)
+        # Generate report in memory; it is dated, so every request differs
+        # and there is nothing to gain from writing it to disk first
+        report_generator = get_component(ReportGenerator, config)
+        report_pdf = report_generator.generate_pdf_bytes(doc_path)
 
-        return send_file(report_path, as_attachment=True,
+        return send_file(io.BytesIO(report_pdf), mimetype='application/pdf',
+                        as_attachment=True,
                         download_name=f'compliance_report_{file_id}.pdf')
 
     except Exception as e:
@@ -217,25 +410,28 @@ def generate_report(file_id):
 
 @app.route('/download/<file_id>')
 def download_document(file_id):
-    """Download processed document"""
+    """Download processed document
+
+    Files are sent by path so the WSGI server can use its file wrapper
+    (sendfile) and clients can revalidate with ETag/If-Modified-Since.
+    """
     try:
-        # Find the corrected document file
-        corrected_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER'])
-                          if f.startswith(f"{file_id}_corrected")]
-
-        if corrected_files:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], corrected_files[0])
-            original_name = corrected_files[0].replace(f"{file_id}_corrected_", "")
-            return send_file(file_path, as_attachment=True,
-                           download_name=f"corrected_{original_name}")
-        else:
-            # If no corrected version, return original
-            original_files = [f for f in os.listdir(app.config['UPLOAD_FOLDER'])
-                            if f.startswith(file_id) and not f.endswith('_corrected.docx')]
-            if original_files:
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], original_files[0])
-                original_name = original_files[0].replace(f"{file_id}_", "")
-                return send_file(file_path, as_attachment=True, download_name=original_name)
+        entry = get_file_entry(file_id)
+        if not entry:
+            return jsonify({'error': 'Document not found'}), 404
+
+        original_name = entry.get('filename', f"{file_id}.docx")
+
+        # Prefer the corrected document file
+        if entry.get('corrected'):
+            return send_file(entry['corrected'], as_attachment=True,
+                           download_name=f"corrected_{original_name}",
+                           conditional=True, etag=True)
+
+        # If no corrected version, return original
+        if entry.get('original'):
+            return send_file(entry['original'], as_attachment=True, download_name=original_name,
+                           conditional=True, etag=True)
 
         return jsonify({'error': 'Document not found'}), 404
 
@@ -246,18 +442,24 @@ def download_document(file_id):
 def get_processing_status(file_id):
     """Get processing status for file"""
     try:
-        # Check if processing is complete by looking for processed files
-        files = [f for f in os.listdir(app.config['UPLOAD_FOLDER']) if f.startswith(file_id)]
-
-        if not files:
+        entry = get_file_entry(file_id)
+        if not entry:
             return jsonify({'status': 'not_found'})
 
-        # Simple status check - in a real implementation, you'd track this properly
-        return jsonify({
+        files = [path for key, path in entry.items() if key not in ('filename', 'status')]
+        status = {
             'status': 'completed',
             'files_found': len(files),
             'timestamp': datetime.now().isoformat()
-        })
+        }
+
+        # Documents uploaded before statuses were persisted have no status file
+        # and are reported as completed without a result
+        job_status = read_job_status(entry['status']) if entry.get('status') else None
+        if job_status:
+            status.update(job_status)
+
+        return jsonify(status)
 
     except Exception as e:
         return jsonify({'error': f'Status check failed: {str(e)}'}), 500
@@ -281,8 +483,5 @@ def internal_error(e):
     return jsonify({'error': 'Internal server error occurred.'}), 500
 
 if __name__ == '__main__':
-    # Ensure temp directory exists
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
     # Run the application
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,86 @@
+import io
+import threading
+
+# Buffers kept for reuse; each may grow to the size of the largest saved document
+MAX_POOLED_BUFFERS = 4
+MIN_BUFFER_SIZE = 1024 * 1024  # 1MB
+
+_pool = []
+_lock = threading.Lock()
+
+
+def acquire(size=0):
+    """Take a bytearray of at least size bytes from the pool, or allocate a new one"""
+    with _lock:
+        for i, buffer in enumerate(_pool):
+            if len(buffer) >= size:
+                return _pool.pop(i)
+
+    return bytearray(max(size, MIN_BUFFER_SIZE))
+
+
+def release(buffer):
+    """Return a bytearray to the pool so a later request can reuse its memory"""
+    with _lock:
+        if len(_pool) < MAX_POOLED_BUFFERS:
+            _pool.append(buffer)
+
+
+class PooledBuffer(io.RawIOBase):
+    """Seekable, write-only in-memory stream backed by a pooled bytearray.
+
+    Used in place of BytesIO when saving documents so repeated saves reuse
+    the same memory instead of allocating a fresh multi-megabyte buffer.
+    The bytearray's length is its capacity; the bytes written so far are
+    tracked separately so reuse never has to shrink or regrow it.
+    """
+
+    def __init__(self, size_hint=0):
+        super().__init__()
+        self._buffer = acquire(size_hint)
+        self._size = 0
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        data = memoryview(data).cast('B')
+        end = self._position + len(data)
+
+        if end > len(self._buffer):
+            self._buffer.extend(bytes(end - len(self._buffer)))
+
+        self._buffer[self._position:end] = data
+        self._position = end
+        self._size = max(self._size, end)
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f'Invalid whence: {whence}')
+
+        if position < 0:
+            raise ValueError(f'Negative seek position: {position}')
+
+        self._position = position
+        return position
+
+    def getbuffer(self):
+        """Return a memoryview of the bytes written so far (release it before close)"""
+        return memoryview(self._buffer)[:self._size]
+
+    def close(self):
+        if not self.closed and self._buffer is not None:
+            release(self._buffer)
+            self._buffer = None
+        super().close()
@@ -1,10 +1,34 @@
 import os
+import re
 import logging
+from collections import Counter, defaultdict
 from datetime import datetime
 from docx import Document
-from docx.shared import Inches, Pt, Cm
+from docx.shared import Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
 from .document_restructurer import DocumentRestructurer
+from .doc_cache import get_cached_document, invalidate_document
+from .bufpool import PooledBuffer
+
+# Namespace-qualified run property names, resolved once
+W_RPR = qn('w:rPr')
+W_R = qn('w:r')
+W_T = qn('w:t')
+W_TAB = qn('w:tab')
+W_BREAKS = (qn('w:br'), qn('w:cr'))
+W_RFONTS = qn('w:rFonts')
+W_ASCII = qn('w:ascii')
+W_HANSI = qn('w:hAnsi')
+W_SZ = qn('w:sz')
+W_VAL = qn('w:val')
+
+# Body paragraph runs (the same runs as doc.paragraphs[i].runs) that set a
+# font or size of their own
+OVERRIDING_RUNS_XPATH = './w:p/w:r[w:rPr/w:rFonts or w:rPr/w:sz]'
+
+# Numbers like 50.5 (but not version numbers or ranges)
+DECIMAL_RE = re.compile(r'\b(\d+)\.(\d{1,3})\b(?!\d)')
 
 class DocumentCorrector:
     """Applies automatic corrections to documents"""
@@ -14,12 +38,32 @@ class DocumentCorrector:
         self.logger = logging.getLogger(__name__)
         self.restructurer = DocumentRestructurer(config)
 
+        # Correction types applied to the document as a whole
+        self._document_handlers = {
+            'margin': self._apply_margin_corrections,
+            'margins': self._apply_margin_corrections,
+        }
+
+        # Correction types fused into the single pass over runs and paragraphs;
+        # paragraph mutators run in this order, and decimal separator fixes
+        # rewrite paragraph text, so they go last
+        self._run_mutator_factories = {
+            'font': self._make_font_mutator,
+            'font_size': self._make_font_size_mutator,
+        }
+        self._paragraph_mutator_factories = {
+            'line_spacing': self._make_line_spacing_mutator,
+            'heading_alignment': self._make_heading_alignment_mutator,
+            'decimal_separator': self._make_decimal_separator_mutator,
+        }
+
     def apply_corrections(self, document_path, corrections_to_apply):
         """Apply specified corrections to document"""
         corrections_applied = []
         corrections_failed = []
 
         try:
+            # Corrections mutate the document, so load a private copy
             doc = Document(document_path)
 
             # Group corrections by type for efficient processing
@@ -30,41 +74,18 @@ class DocumentCorrector:
                     corrections_by_type[correction_type] = []
                 corrections_by_type[correction_type].append(correction)
 
-            # Apply margin corrections
-            if 'margin' in corrections_by_type:
-                result = self._apply_margin_corrections(doc, corrections_by_type['margin'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
-
-            # Apply font corrections
-            if 'font' in corrections_by_type:
-                result = self._apply_font_corrections(doc, corrections_by_type['font'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
-
-            # Apply font size corrections
-            if 'font_size' in corrections_by_type:
-                result = self._apply_font_size_corrections(doc, corrections_by_type['font_size'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
-
-            # Apply line spacing corrections
-            if 'line_spacing' in corrections_by_type:
-                result = self._apply_line_spacing_corrections(doc, corrections_by_type['line_spacing'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
-
-            # Apply heading alignment corrections
-            if 'heading_alignment' in corrections_by_type:
-                result = self._apply_heading_alignment_corrections(doc, corrections_by_type['heading_alignment'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
+            # Apply document-level corrections for the types requested
+            for correction_type, corrections in corrections_by_type.items():
+                handler = self._document_handlers.get(correction_type)
+                if handler:
+                    result = handler(doc, corrections)
+                    corrections_applied.extend(result['applied'])
+                    corrections_failed.extend(result['failed'])
 
-            # Apply text formatting corrections
-            if 'decimal_separator' in corrections_by_type:
-                result = self._apply_decimal_separator_corrections(doc, corrections_by_type['decimal_separator'])
-                corrections_applied.extend(result['applied'])
-                corrections_failed.extend(result['failed'])
+            # Apply font, spacing, heading and text corrections in one pass
+            result = self._apply_paragraph_corrections(doc, corrections_by_type)
+            corrections_applied.extend(result['applied'])
+            corrections_failed.extend(result['failed'])
 
             # Apply document restructuring
             if 'document_restructure' in corrections_by_type:
@@ -74,7 +95,7 @@ class DocumentCorrector:
                 # If restructuring was successful, use the restructured file path
                 if result.get('restructured_file_path'):
                     document_path = result['restructured_file_path']
-                    doc = Document(document_path)  # Reload document
+                    doc = get_cached_document(document_path)  # Reload document
 
             # Save corrected document
             corrected_path = self._save_corrected_document(doc, document_path)
@@ -98,146 +119,220 @@ class DocumentCorrector:
             }
 
     def _apply_margin_corrections(self, doc, margin_corrections):
-        """Apply margin corrections to all sections"""
-        applied = []
-        failed = []
-
-        try:
-            for section in doc.sections:
-                for correction in margin_corrections:
-                    margin_type = correction.get('margin')
-                    value_cm = correction.get('value')
-
-                    if margin_type == 'top':
-                        section.top_margin = Cm(value_cm)
-                        applied.append(f'Set top margin to {value_cm}cm')
-                    elif margin_type == 'bottom':
-                        section.bottom_margin = Cm(value_cm)
-                        applied.append(f'Set bottom margin to {value_cm}cm')
-                    elif margin_type == 'left':
-                        section.left_margin = Cm(value_cm)
-                        applied.append(f'Set left margin to {value_cm}cm')
-                    elif margin_type == 'right':
-                        section.right_margin = Cm(value_cm)
-                        applied.append(f'Set right margin to {value_cm}cm')
-
-        except Exception as e:
-            failed.append(f'Failed to apply margin corrections: {str(e)}')
-
-        return {'applied': applied, 'failed': failed}
-
-    def _apply_font_corrections(self, doc, font_corrections):
-        """Apply font family corrections"""
-        applied = []
+        """Apply single ('margin') or batched ('margins') margin corrections to all sections"""
+        tally = defaultdict(Counter)
         failed = []
 
         try:
-            expected_font = self.config['typography']['body_font']['family']
-
-            for paragraph in doc.paragraphs:
-                for run in paragraph.runs:
-                    if run.font.name and run.font.name != expected_font:
-                        old_font = run.font.name
-                        run.font.name = expected_font
-                        applied.append(f'Changed font from {old_font} to {expected_font}')
-
-        except Exception as e:
-            failed.append(f'Failed to apply font corrections: {str(e)}')
+            # Convert each requested margin once instead of once per section
+            margin_values = {}
+            for correction in margin_corrections:
+                requested = correction.get('values') or {correction.get('margin'): correction.get('value')}
+                for margin_type, value_cm in requested.items():
+                    if margin_type in ('top', 'bottom', 'left', 'right'):
+                        margin_values[f'{margin_type}_margin'] = (value_cm, Cm(value_cm))
 
-        return {'applied': applied, 'failed': failed}
-
-    def _apply_font_size_corrections(self, doc, font_size_corrections):
-        """Apply font size corrections"""
-        applied = []
-        failed = []
-
-        try:
-            expected_size = int(self.config['typography']['body_font']['size'].replace('pt', ''))
-
-            for paragraph in doc.paragraphs:
-                for run in paragraph.runs:
-                    if run.font.size and run.font.size.pt != expected_size:
-                        old_size = run.font.size.pt
-                        run.font.size = Pt(expected_size)
-                        applied.append(f'Changed font size from {old_size}pt to {expected_size}pt')
-
-        except Exception as e:
-            failed.append(f'Failed to apply font size corrections: {str(e)}')
-
-        return {'applied': applied, 'failed': failed}
-
-    def _apply_line_spacing_corrections(self, doc, spacing_corrections):
-        """Apply line spacing corrections"""
-        applied = []
-        failed = []
-
-        try:
-            expected_spacing = self.config['typography']['line_spacing']['body_text']
+            for section in doc.sections:
+                for attribute, (value_cm, margin) in margin_values.items():
+                    old_margin = getattr(section, attribute)
+                    setattr(section, attribute, margin)
 
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():  # Only apply to non-empty paragraphs
-                    current_spacing = paragraph.paragraph_format.line_spacing
-                    if current_spacing and abs(current_spacing - expected_spacing) > 0.1:
-                        paragraph.paragraph_format.line_spacing = expected_spacing
-                        applied.append(f'Set line spacing to {expected_spacing}')
+                    old_value = f'{old_margin.cm:.1f}cm' if old_margin is not None else 'unset'
+                    tally[(attribute, f'{value_cm}cm')][old_value] += 1
 
         except Exception as e:
-            failed.append(f'Failed to apply line spacing corrections: {str(e)}')
+            failed.append(f'Failed to apply margin corrections: {str(e)}')
 
-        return {'applied': applied, 'failed': failed}
+        return {'applied': self._summarize_corrections(tally), 'failed': failed}
 
-    def _apply_heading_alignment_corrections(self, doc, alignment_corrections):
-        """Apply heading alignment corrections"""
-        applied = []
+    def _apply_paragraph_corrections(self, doc, corrections_by_type):
+        """Apply run- and paragraph-level corrections in a single pass over the document"""
+        tally = defaultdict(Counter)
         failed = []
 
-        try:
-            for paragraph in doc.paragraphs:
-                text = paragraph.text.strip().upper()
-                if text.startswith('BAB '):
-                    if paragraph.alignment != WD_ALIGN_PARAGRAPH.CENTER:
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        applied.append(f'Center-aligned chapter heading: {text}')
-
-                    # Make heading bold
-                    for run in paragraph.runs:
-                        if not run.bold:
-                            run.bold = True
-                            applied.append(f'Made chapter heading bold: {text}')
-
-        except Exception as e:
-            failed.append(f'Failed to apply heading alignment corrections: {str(e)}')
-
-        return {'applied': applied, 'failed': failed}
+        run_mutators = [
+            make_mutator() for correction_type, make_mutator in self._run_mutator_factories.items()
+            if correction_type in corrections_by_type
+        ]
+        paragraph_mutators = [
+            make_mutator() for correction_type, make_mutator in self._paragraph_mutator_factories.items()
+            if correction_type in corrections_by_type
+        ]
 
-    def _apply_decimal_separator_corrections(self, doc, decimal_corrections):
-        """Apply decimal separator corrections"""
-        applied = []
-        failed = []
+        if not run_mutators and not paragraph_mutators:
+            return {'applied': [], 'failed': failed}
 
         try:
-            for paragraph in doc.paragraphs:
-                original_text = paragraph.text
-                # Replace decimal dots with commas (simple approach)
-                corrected_text = self._fix_decimal_separators(original_text)
-
-                if corrected_text != original_text:
-                    # Clear existing runs and add corrected text
-                    paragraph.clear()
-                    paragraph.add_run(corrected_text)
-                    applied.append(f'Fixed decimal separators in paragraph')
+            if run_mutators:
+                # Runs without their own font or size inherit the document style
+                # and are never changed, so let lxml select only the overrides
+                for r in doc.element.body.xpath(OVERRIDING_RUNS_XPATH):
+                    for mutate in run_mutators:
+                        mutate(r, tally)
+
+            if paragraph_mutators:
+                for paragraph in doc.paragraphs:
+                    for mutate in paragraph_mutators:
+                        mutate(paragraph, tally)
 
         except Exception as e:
-            failed.append(f'Failed to apply decimal separator corrections: {str(e)}')
-
-        return {'applied': applied, 'failed': failed}
-
-    def _fix_decimal_separators(self, text):
-        """Fix decimal separators in text"""
-        import re
-        # Replace numbers like 50.5 with 50,5 (but not version numbers or ranges)
-        pattern = r'\b(\d+)\.(\d{1,3})\b(?!\d)'
-        return re.sub(pattern, r'\1,\2', text)
+            failed.append(f'Failed to apply paragraph corrections: {str(e)}')
+
+        return {'applied': self._summarize_corrections(tally), 'failed': failed}
+
+    def _summarize_corrections(self, tally):
+        """Collapse a tally of {(type, new_value): Counter(old_value)} into one entry per type"""
+        return [
+            {
+                'type': correction_type,
+                'count': sum(old_values.values()),
+                'old_values': {str(old_value): count for old_value, count in old_values.items()},
+                'new_value': new_value
+            }
+            for (correction_type, new_value), old_values in tally.items()
+        ]
+
+    def _make_font_mutator(self):
+        """Build a <w:r> mutator that applies font family corrections"""
+        expected_font = self.config['typography']['body_font']['family']
+
+        def mutate(r, tally):
+            # Read <w:rPr><w:rFonts w:ascii=...> directly instead of run.font.name
+            rPr = r.find(W_RPR)
+            if rPr is None:
+                return
+            rFonts = rPr.find(W_RFONTS)
+            if rFonts is None:
+                return
+
+            old_font = rFonts.get(W_ASCII)
+            if old_font and old_font != expected_font:
+                rFonts.set(W_ASCII, expected_font)
+                rFonts.set(W_HANSI, expected_font)
+                tally[('font', expected_font)][old_font] += 1
+
+        return mutate
+
+    def _make_font_size_mutator(self):
+        """Build a <w:r> mutator that applies font size corrections"""
+        expected_size = int(self.config['typography']['body_font']['size'].replace('pt', ''))
+        expected_half_points = str(expected_size * 2)
+
+        def mutate(r, tally):
+            # Read <w:rPr><w:sz w:val=...> (in half-points) directly instead of run.font.size
+            rPr = r.find(W_RPR)
+            if rPr is None:
+                return
+            sz = rPr.find(W_SZ)
+            if sz is None:
+                return
+
+            value = sz.get(W_VAL)
+            if value and value.isdigit():
+                old_size = int(value) / 2.0
+            else:
+                # Universal measures such as "12pt" are rare; let python-docx parse them
+                old_size = rPr.sz_val.pt if rPr.sz_val is not None else None
+
+            if old_size and old_size != expected_size:
+                sz.set(W_VAL, expected_half_points)
+                tally[('font_size', f'{expected_size}pt')][f'{old_size}pt'] += 1
+
+        return mutate
+
+    def _make_line_spacing_mutator(self):
+        """Build a paragraph mutator that applies line spacing corrections"""
+        expected_spacing = self.config['typography']['line_spacing']['body_text']
+
+        def mutate(paragraph, tally):
+            if paragraph.text.strip():  # Only apply to non-empty paragraphs
+                current_spacing = paragraph.paragraph_format.line_spacing
+                if current_spacing and abs(current_spacing - expected_spacing) > 0.1:
+                    paragraph.paragraph_format.line_spacing = expected_spacing
+                    tally[('line_spacing', expected_spacing)][current_spacing] += 1
+
+        return mutate
+
+    def _make_heading_alignment_mutator(self):
+        """Build a paragraph mutator that applies heading alignment corrections"""
+        def mutate(paragraph, tally):
+            text = paragraph.text.strip().upper()
+            if text.startswith('BAB '):
+                if paragraph.alignment != WD_ALIGN_PARAGRAPH.CENTER:
+                    old_alignment = paragraph.alignment
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                    if old_alignment is None:
+                        old_alignment = 'inherited'
+                    tally[('heading_alignment', 'center')][old_alignment] += 1
+
+                # Make heading bold
+                for run in paragraph.runs:
+                    if not run.bold:
+                        run.bold = True
+                        tally[('heading_bold', True)][text] += 1
+
+        return mutate
+
+    def _make_decimal_separator_mutator(self):
+        """Build a paragraph mutator that applies decimal separator corrections"""
+        def mutate(paragraph, tally):
+            replacements = self._fix_decimal_separators(self._paragraph_text_segments(paragraph._p))
+            if replacements:
+                tally[('decimal_separator', ',')]['.'] += replacements
+
+        return mutate
+
+    def _paragraph_text_segments(self, p):
+        """Split a paragraph's run text into (<w:t> or None, text) pieces.
+
+        Follows the paragraph's own runs the way paragraph.text does: tabs and
+        breaks become '\\t' and '\\n' pieces without an element, and text in
+        nested content such as text boxes is left out.
+        """
+        segments = []
+        for r in p.iterchildren(W_R):
+            for child in r:
+                tag = child.tag
+                if tag == W_T:
+                    segments.append((child, child.text or ''))
+                elif tag == W_TAB:
+                    segments.append((None, '\t'))
+                elif tag in W_BREAKS:
+                    segments.append((None, '\n'))
+        return segments
+
+    def _fix_decimal_separators(self, segments):
+        """Fix decimal separators in place across <w:t> elements, returning the replacement count"""
+        texts = [text for _, text in segments]
+        full_text = ''.join(texts)
+        if '.' not in full_text:
+            return 0
+
+        # Match on the joined text because a number may be split across runs,
+        # e.g. "50" and ".5"; the offset of each decimal dot in it
+        dots = [match.end(1) for match in DECIMAL_RE.finditer(full_text)]
+        if not dots:
+            return 0
+
+        # Replacing "." with "," keeps every offset valid, so only the <w:t>
+        # elements holding a dot are rewritten and run formatting is kept; a
+        # dot is never in a tab or break piece, which has no element
+        dot_iter = iter(dots)
+        dot = next(dot_iter)
+        offset = 0
+        for t, text in segments:
+            end = offset + len(text)
+            if dot < end:
+                chars = list(text)
+                while dot is not None and dot < end:
+                    chars[dot - offset] = ','
+                    dot = next(dot_iter, None)
+                t.text = ''.join(chars)
+                if dot is None:
+                    break
+            offset = end
+
+        return len(dots)
 
     def _save_corrected_document(self, doc, original_path):
         """Save the corrected document"""
@@ -256,8 +351,13 @@ class DocumentCorrector:
 
             corrected_path = os.path.join('temp', corrected_filename)
 
-            # Save the document
-            doc.save(corrected_path)
+            # Serialize into a pooled in-memory buffer, then write the file in
+            # one call instead of the many small writes zipfile makes
+            with PooledBuffer() as buffer:
+                doc.save(buffer)
+                with buffer.getbuffer() as data, open(corrected_path, 'wb') as f:
+                    f.write(data)
+            invalidate_document(corrected_path)
 
             self.logger.info(f"Corrected document saved: {corrected_path}")
             return corrected_path
@@ -317,16 +417,20 @@ class DocumentCorrector:
                 {'reorder_chapters': True}
             )
 
-            if result['success']:
-                applied.extend(result['changes_applied'])
-                applied.append(f"Document restructured from order: {result.get('original_order', [])} to: {result.get('corrected_order', [])}")
+            if result['success'] and result['changes_applied']:
+                applied.append({
+                    'type': 'document_restructure',
+                    'count': len(result['changes_applied']),
+                    'old_value': result.get('original_order', []),
+                    'new_value': result.get('corrected_order', [])
+                })
 
                 return {
                     'applied': applied,
                     'failed': failed,
                     'restructured_file_path': result['restructured_file_path']
                 }
-            else:
+            elif not result['success']:
                 failed.append(f"Document restructuring failed: {result.get('message', 'Unknown error')}")
 
         except Exception as e:
@@ -0,0 +1,56 @@
+import os
+import threading
+from collections import OrderedDict
+from docx import Document
+
+# Maximum number of parsed documents kept in memory
+MAX_CACHED_DOCUMENTS = 32
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def document_key(document_path):
+    """Build a cache key that changes whenever the file is rewritten"""
+    stat = os.stat(document_path)
+    return (os.path.abspath(document_path), stat.st_mtime_ns, stat.st_size)
+
+
+def get_cached_document(document_path):
+    """Return a parsed Document for the path, reusing earlier parses of the same file.
+
+    The returned object is shared between callers and must be treated as
+    read-only. Callers that modify the document should load their own copy
+    with Document(document_path).
+    """
+    key = document_key(document_path)
+
+    with _lock:
+        doc = _cache.get(key)
+        if doc is not None:
+            _cache.move_to_end(key)
+            return doc
+
+    doc = Document(document_path)
+
+    with _lock:
+        _cache[key] = doc
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_DOCUMENTS:
+            _cache.popitem(last=False)
+
+    return doc
+
+
+def is_cached_document(doc):
+    """Check whether a Document is one of the shared, read-only cached parses"""
+    with _lock:
+        return any(cached is doc for cached in _cache.values())
+
+
+def invalidate_document(document_path):
+    """Drop every cached parse of the given path"""
+    abs_path = os.path.abspath(document_path)
+    with _lock:
+        for key in [k for k in _cache if k[0] == abs_path]:
+            del _cache[key]
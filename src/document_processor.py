@@ -1,10 +1,20 @@
 import os
+import errno
+import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from docx import Document
+from docx.oxml.ns import qn
+from .doc_cache import get_cached_document
 from .validator import DocumentValidator
 from .corrector import DocumentCorrector
 
+W_P = qn('w:p')
+W_R = qn('w:r')
+
+# os.link errors meaning a hard link is impossible here rather than a real failure
+LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP}
+
 class DocumentProcessor:
     """Main document processing coordinator"""
 
@@ -12,16 +22,6 @@ class DocumentProcessor:
         self.config = config
         self.validator = DocumentValidator(config)
         self.corrector = DocumentCorrector(config)
-
-        # Set up logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('temp/processing.log'),
-                logging.StreamHandler()
-            ]
-        )
         self.logger = logging.getLogger(__name__)
 
     def process_document(self, document_path, file_id):
@@ -30,15 +30,22 @@ class DocumentProcessor:
 
         try:
             # Load document
-            doc = Document(document_path)
+            doc = get_cached_document(document_path)
             self.logger.info(f"Document loaded successfully: {len(doc.paragraphs)} paragraphs")
 
-            # Create backup
-            backup_path = self._create_backup(document_path, file_id)
+            # Backup (file I/O), validation and document info only read the
+            # loaded document, so run them concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                backup_future = executor.submit(self._create_backup, document_path, file_id)
+                info_future = executor.submit(self._get_document_info, doc)
+
+                self.logger.info("Starting document validation...")
+                validation_future = executor.submit(self.validator.validate_document, document_path)
+
+                backup_path = backup_future.result()
+                document_info = info_future.result()
+                violations = validation_future.result()
 
-            # Validate document
-            self.logger.info("Starting document validation...")
-            violations = self.validator.validate_document(document_path)
             self.logger.info(f"Validation complete: {len(violations)} violations found")
 
             # Categorize violations by severity
@@ -51,7 +58,7 @@ class DocumentProcessor:
 
             processing_result = {
                 'timestamp': datetime.now().isoformat(),
-                'document_info': self._get_document_info(doc),
+                'document_info': document_info,
                 'validation': {
                     'total_violations': len(violations),
                     'errors': len(errors),
@@ -80,9 +87,16 @@ class DocumentProcessor:
             backup_filename = f"{file_id}_backup.docx"
             backup_path = os.path.join('temp', backup_filename)
 
-            # Copy file
-            with open(document_path, 'rb') as src, open(backup_path, 'wb') as dst:
-                dst.write(src.read())
+            # The original upload is never modified (corrections are saved to
+            # separate files), so a hard link is as good as a copy
+            try:
+                self._link_or_copy(document_path, backup_path)
+            except FileExistsError:
+                # Re-run for the same upload: reuse a backup that already links
+                # to it, otherwise replace the stale file
+                if not os.path.samefile(document_path, backup_path):
+                    os.unlink(backup_path)
+                    self._link_or_copy(document_path, backup_path)
 
             self.logger.info(f"Backup created: {backup_path}")
             return backup_path
@@ -91,16 +105,31 @@ class DocumentProcessor:
             self.logger.error(f"Failed to create backup: {str(e)}")
             raise
 
+    def _link_or_copy(self, source_path, target_path):
+        """Hard-link source_path to target_path, copying where links are not possible"""
+        try:
+            os.link(source_path, target_path)
+        except OSError as e:
+            if e.errno not in LINK_FALLBACK_ERRNOS:
+                raise
+            # Cross-device or unsupported filesystem: fall back to copying
+            shutil.copyfile(source_path, target_path)
+
     def _get_document_info(self, doc):
         """Extract basic document information"""
         try:
-            paragraph_count = len(doc.paragraphs)
+            # Body paragraphs straight from the XML, without python-docx wrappers
+            paragraphs = doc.element.body.findall(W_P)
+            paragraph_count = len(paragraphs)
             table_count = len(doc.tables)
 
-            # Count words (simple approach)
-            word_count = 0
-            for paragraph in doc.paragraphs:
-                word_count += len(paragraph.text.split())
+            # Count words (simple approach); join each paragraph's runs first
+            # because a single word is often split across several runs. Run
+            # text maps tabs and breaks to whitespace, as paragraph.text does
+            word_count = sum(
+                len(''.join([r.text for r in p.iterchildren(W_R)]).split())
+                for p in paragraphs
+            )
 
             # Get document properties
             props = doc.core_properties
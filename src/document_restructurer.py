@@ -1,10 +1,84 @@
 import re
 import os
+import bisect
+from copy import deepcopy
 import logging
+import threading
+import weakref
+from dataclasses import asdict, dataclass, field
+from operator import attrgetter
 from datetime import datetime
 from docx import Document
 from docx.shared import Inches, Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from .doc_cache import get_cached_document, invalidate_document, is_cached_document
+
+# A chapter heading (BAB I PENDAHULUAN, in any case) or a subsection heading
+# (1.1, 1.1.1, A., 1.), matched in one go; longest numbering alternative first
+# so 1.1.1 is not tried as 1.1
+LINE_RE = re.compile(
+    r'(?i:BAB\s+(?P<roman>[IVX]+))\s+(?P<chapter_title>.+)'
+    r'|(?P<number>\d+\.\d+\.\d+|\d+\.\d+|[A-Z]\.|[0-9]+\.)\s+(?P<title>.+)'
+)
+RENUMBER_RE = re.compile(r'(\d+)\.(\d+)\s+(.+)')
+BAB_PREFIX_RE = re.compile(r'^BAB\s+[IVX]+\s+')
+
+# Chapter numerals in practice (BAB I to BAB X); others fall back to the general conversion
+ROMAN_TO_INT = {'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6, 'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10}
+INT_TO_ROMAN = ['', 'I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX', 'X']
+
+# Paragraph content that refers to other parts of the source package:
+# relationship ids (images, hyperlinks) and footnote, endnote and comment ids
+FOREIGN_REFERENCES_XPATH = (
+    './/@r:* | .//w:footnoteReference | .//w:endnoteReference'
+    ' | .//w:commentReference | .//w:commentRangeStart | .//w:commentRangeEnd'
+)
+
+W_P = qn('w:p')
+W_R = qn('w:r')
+W_RPR = qn('w:rPr')
+
+# Structure analyses of parsed documents, shared by the validator, the
+# restructuring preview and the restructurer itself. Only the read-only
+# documents handed out by doc_cache (one per file version) are cached, keyed on
+# their part (the Document wrapper itself cannot be weakly referenced), so an
+# entry goes away together with its document
+_analysis_cache = weakref.WeakKeyDictionary()
+_analysis_lock = threading.Lock()
+
+@dataclass(slots=True)
+class SubsectionInfo:
+    """A numbered subsection heading found under a chapter"""
+    paragraph_index: int
+    number: str
+    title: str
+    full_text: str
+
+
+@dataclass(slots=True)
+class ChapterInfo:
+    """A BAB chapter heading and the subsections that follow it"""
+    paragraph_index: int
+    roman_numeral: str
+    chapter_number: int
+    title: str
+    full_text: str
+    subsections: list = field(default_factory=list)
+
+
+def serialize_analysis(analysis):
+    """Return a structure analysis with its chapters and subsections as plain dicts"""
+    return {**analysis, 'chapters': [asdict(ch) for ch in analysis['chapters']]}
+
+
+def iter_paragraph_texts(doc):
+    """Yield (index, text) for each body paragraph, read straight from the XML"""
+    # Same paragraphs, indexes and text as doc.paragraphs, without building a
+    # Paragraph wrapper per element for read-only scans; run text maps tabs
+    # and breaks to '\t' and '\n' like paragraph.text does
+    for para_idx, p in enumerate(doc.element.body.iterchildren(W_P)):
+        yield para_idx, ''.join([r.text for r in p.iterchildren(W_R)])
 
 class DocumentRestructurer:
     """Automatically restructures documents to match UNISMUH standards"""
@@ -16,7 +90,28 @@ class DocumentRestructurer:
     def analyze_document_structure(self, document_path):
         """Analyze current document structure and identify issues"""
         try:
-            doc = Document(document_path)
+            doc = get_cached_document(document_path)
+        except Exception as e:
+            return self._analysis_error(e)
+
+        return self.analyze_document_structure_from_doc(doc)
+
+    def analyze_document_structure_from_doc(self, doc):
+        """Analyze the structure of an already loaded document.
+
+        Results for documents from get_cached_document are cached per document
+        and config, and shared between callers, so they must be treated as
+        read-only. Documents loaded by the caller may be modified afterwards
+        and are analyzed afresh on every call.
+        """
+        try:
+            cacheable = is_cached_document(doc)
+            if cacheable:
+                with _analysis_lock:
+                    cached = _analysis_cache.get(doc.part)
+                    if cached is not None and cached[0] is self.config:
+                        return cached[1]
+
             analysis = {
                 'chapters': [],
                 'structure_issues': [],
@@ -25,51 +120,73 @@ class DocumentRestructurer:
                 'extra_sections': []
             }
 
-            # Extract all chapters and their positions
-            for para_idx, paragraph in enumerate(doc.paragraphs):
-                text = paragraph.text.strip().upper()
+            # Extract chapters, their positions and their subsections in one pass.
+            # Prefiltering heading candidates with an XPath over string(.) was
+            # measured slower: libxml2 walks the same text nodes as this join,
+            # and mapping matches back to paragraph indexes costs extra
+            current_chapter = None
+            for para_idx, para_text in iter_paragraph_texts(doc):
+                stripped = para_text.strip()
+
+                # Most paragraphs are body text and fail this single match
+                line_match = LINE_RE.match(stripped)
+                if not line_match:
+                    continue
 
                 # Detect chapter headings (BAB I, BAB II, etc.)
-                chapter_match = re.match(r'BAB\s+([IVX]+)\s+(.+)', text)
-                if chapter_match:
-                    roman_num = chapter_match.group(1)
-                    chapter_title = chapter_match.group(2).strip()
+                if line_match.lastgroup == 'chapter_title':
+                    text = stripped.upper()
+                    roman_num = line_match.group('roman').upper()
+                    chapter_title = line_match.group('chapter_title').strip().upper()
 
                     # Convert roman to integer for ordering
                     chapter_num = self._roman_to_int(roman_num)
 
-                    chapter_info = {
-                        'paragraph_index': para_idx,
-                        'roman_numeral': roman_num,
-                        'chapter_number': chapter_num,
-                        'title': chapter_title,
-                        'full_text': text,
-                        'subsections': []
-                    }
+                    chapter_info = ChapterInfo(
+                        paragraph_index=para_idx,
+                        roman_numeral=roman_num,
+                        chapter_number=chapter_num,
+                        title=chapter_title,
+                        full_text=text
+                    )
 
                     analysis['chapters'].append(chapter_info)
+                    current_chapter = chapter_info
+                    continue
 
-            # Check if chapters are in correct order
+                # Otherwise a subsection (1.1, 1.2, etc. or A., B., etc.)
+                if current_chapter is not None:
+                    current_chapter.subsections.append(SubsectionInfo(
+                        paragraph_index=para_idx,
+                        number=line_match.group('number'),
+                        title=line_match.group('title'),
+                        full_text=stripped
+                    ))
+
+            # Check if chapters are in correct order; the pairwise scan stops at
+            # the first inversion, and only the error path needs a sorted copy
             if len(analysis['chapters']) > 1:
-                chapter_numbers = [ch['chapter_number'] for ch in analysis['chapters']]
-                sorted_numbers = sorted(chapter_numbers)
+                chapter_numbers = [ch.chapter_number for ch in analysis['chapters']]
+                in_order = all(a <= b for a, b in zip(chapter_numbers, chapter_numbers[1:]))
 
-                if chapter_numbers != sorted_numbers:
+                if not in_order:
                     analysis['reordering_needed'] = True
                     analysis['structure_issues'].append({
                         'type': 'chapter_order',
                         'severity': 'error',
-                        'message': f'Chapters are not in correct order: found {chapter_numbers}, should be {sorted_numbers}',
+                        'message': f'Chapters are not in correct order: found {chapter_numbers}, should be {sorted(chapter_numbers)}',
                         'auto_correctable': True
                     })
 
             # Check for required chapters (BAB I, II, III for proposal)
             required_chapters = self.config['document_types']['proposal']['required_sections']
-            found_chapter_titles = [ch['title'] for ch in analysis['chapters']]
+            # Titles are already upper case; one newline-separated string lets a
+            # single substring search cover every chapter
+            titles_blob = '\n'.join(ch.title for ch in analysis['chapters'])
 
             for required in required_chapters:
-                required_clean = required.replace('BAB I ', '').replace('BAB II ', '').replace('BAB III ', '')
-                found = any(required_clean in title for title in found_chapter_titles)
+                required_clean = BAB_PREFIX_RE.sub('', required).upper()
+                found = required_clean in titles_blob
 
                 if not found:
                     analysis['missing_sections'].append({
@@ -80,56 +197,33 @@ class DocumentRestructurer:
                         'auto_correctable': False
                     })
 
-            # Extract subsections for each chapter
-            self._extract_subsections(doc, analysis)
-
             self.logger.info(f"Document structure analysis completed: {len(analysis['chapters'])} chapters found")
-            return analysis
-
-        except Exception as e:
-            self.logger.error(f"Error analyzing document structure: {str(e)}")
-            return {
-                'chapters': [],
-                'structure_issues': [{'type': 'analysis_error', 'message': str(e)}],
-                'reordering_needed': False
-            }
-
-    def _extract_subsections(self, doc, analysis):
-        """Extract subsections for each chapter"""
-        try:
-            current_chapter_idx = -1
 
-            for para_idx, paragraph in enumerate(doc.paragraphs):
-                text = paragraph.text.strip()
+            if cacheable:
+                with _analysis_lock:
+                    _analysis_cache[doc.part] = (self.config, analysis)
 
-                # Check if this is a chapter heading
-                if re.match(r'BAB\s+[IVX]+', text.upper()):
-                    current_chapter_idx += 1
-                    continue
-
-                # Check for subsections (1.1, 1.2, etc. or A., B., etc.)
-                subsection_match = re.match(r'(\d+\.\d+|\d+\.\d+\.\d+|[A-Z]\.|[0-9]+\.)\s+(.+)', text)
-                if subsection_match and current_chapter_idx >= 0 and current_chapter_idx < len(analysis['chapters']):
-                    subsection_num = subsection_match.group(1)
-                    subsection_title = subsection_match.group(2)
-
-                    analysis['chapters'][current_chapter_idx]['subsections'].append({
-                        'paragraph_index': para_idx,
-                        'number': subsection_num,
-                        'title': subsection_title,
-                        'full_text': text
-                    })
+            return analysis
 
         except Exception as e:
-            self.logger.error(f"Error extracting subsections: {str(e)}")
-
-    def restructure_document(self, document_path, restructure_options):
+            return self._analysis_error(e)
+
+    def _analysis_error(self, error):
+        """Log a failed structure analysis and return an empty result"""
+        self.logger.error(f"Error analyzing document structure: {str(error)}")
+        return {
+            'chapters': [],
+            'structure_issues': [{'type': 'analysis_error', 'message': str(error)}],
+            'reordering_needed': False
+        }
+
+    def restructure_document(self, document_path, restructure_options, analysis=None):
         """Restructure document according to UNISMUH standards"""
         try:
-            doc = Document(document_path)
-
-            # Analyze current structure
-            analysis = self.analyze_document_structure(document_path)
+            # Analyze current structure, unless the caller already has it
+            # (e.g. from get_restructuring_preview)
+            if analysis is None:
+                analysis = self.analyze_document_structure(document_path)
 
             if not analysis['reordering_needed']:
                 return {
@@ -139,16 +233,27 @@ class DocumentRestructurer:
                     'restructured_file_path': None
                 }
 
+            # Only load the document once there is something to restructure
+            doc = get_cached_document(document_path)
+
             # Create restructured version
             restructured_doc = Document()
             changes_applied = []
 
             # Copy document properties
-            restructured_doc.core_properties.title = doc.core_properties.title
-            restructured_doc.core_properties.author = doc.core_properties.author
+            source_props = doc.core_properties
+            target_props = restructured_doc.core_properties
+            target_props.title = source_props.title
+            target_props.author = source_props.author
 
             # Sort chapters by correct order
-            sorted_chapters = sorted(analysis['chapters'], key=lambda x: x['chapter_number'])
+            sorted_chapters = sorted(analysis['chapters'], key=attrgetter('chapter_number'))
+
+            # Each chapter runs until the next chapter heading in the source
+            # (or the end of the document)
+            source_paragraphs = doc.paragraphs
+            boundaries = sorted(ch.paragraph_index for ch in analysis['chapters'])
+            boundaries.append(len(source_paragraphs))
 
             # Process each chapter in correct order
             for chapter_info in sorted_chapters:
@@ -156,11 +261,11 @@ class DocumentRestructurer:
                 corrected_chapter = self._create_corrected_chapter_heading(
                     restructured_doc, chapter_info
                 )
-                changes_applied.append(f"Reordered chapter: {chapter_info['title']}")
+                changes_applied.append(f"Reordered chapter: {chapter_info.title}")
 
                 # Add chapter content
                 self._copy_chapter_content(
-                    doc, restructured_doc, chapter_info, analysis
+                    source_paragraphs, restructured_doc, chapter_info, boundaries
                 )
 
             # Save restructured document
@@ -173,8 +278,8 @@ class DocumentRestructurer:
                 'message': f'Document successfully restructured with {len(changes_applied)} changes',
                 'changes_applied': changes_applied,
                 'restructured_file_path': restructured_path,
-                'original_order': [ch['title'] for ch in analysis['chapters']],
-                'corrected_order': [ch['title'] for ch in sorted_chapters]
+                'original_order': [ch.title for ch in analysis['chapters']],
+                'corrected_order': [ch.title for ch in sorted_chapters]
             }
 
         except Exception as e:
@@ -190,11 +295,11 @@ class DocumentRestructurer:
         """Create properly formatted chapter heading"""
         try:
             # Convert chapter number back to roman numeral (ensure correct format)
-            correct_roman = self._int_to_roman(chapter_info['chapter_number'])
+            correct_roman = self._int_to_roman(chapter_info.chapter_number)
 
             # Create chapter heading paragraph
             chapter_para = doc.add_paragraph()
-            chapter_run = chapter_para.add_run(f"BAB {correct_roman} {chapter_info['title']}")
+            chapter_run = chapter_para.add_run(f"BAB {correct_roman} {chapter_info.title}")
 
             # Apply correct formatting
             chapter_run.font.name = 'Times New Roman'
@@ -208,64 +313,79 @@ class DocumentRestructurer:
             self.logger.error(f"Error creating chapter heading: {str(e)}")
             return None
 
-    def _copy_chapter_content(self, source_doc, target_doc, chapter_info, analysis):
+    def _copy_chapter_content(self, source_paragraphs, target_doc, chapter_info, boundaries):
         """Copy content from source chapter to target document"""
         try:
-            start_idx = chapter_info['paragraph_index']
+            start_idx = chapter_info.paragraph_index
 
-            # Find end index (start of next chapter or end of document)
-            end_idx = len(source_doc.paragraphs)
-            for other_chapter in analysis['chapters']:
-                if (other_chapter['paragraph_index'] > start_idx and
-                    other_chapter['paragraph_index'] < end_idx):
-                    end_idx = other_chapter['paragraph_index']
+            # End index: the first boundary after this chapter's heading
+            end_idx = boundaries[bisect.bisect_right(boundaries, start_idx)]
 
-            # Copy paragraphs (skip the chapter heading itself)
-            for i in range(start_idx + 1, end_idx):
-                if i < len(source_doc.paragraphs):
-                    para = source_doc.paragraphs[i]
-
-                    # Skip empty paragraphs
-                    if not para.text.strip():
-                        continue
-
-                    # Create new paragraph in target document
-                    new_para = target_doc.add_paragraph()
-
-                    # Copy runs with formatting
-                    for run in para.runs:
-                        new_run = new_para.add_run(run.text)
+            target_body = target_doc.element.body
+            copied = []
 
-                        # Copy run formatting
-                        if run.font.name:
-                            new_run.font.name = run.font.name
-                        if run.font.size:
-                            new_run.font.size = run.font.size
-                        if run.bold:
-                            new_run.bold = run.bold
-                        if run.italic:
-                            new_run.italic = run.italic
+            # Copy paragraphs (skip the chapter heading itself)
+            for para in source_paragraphs[start_idx + 1:end_idx]:
+                # Skip empty paragraphs
+                if not para.text.strip():
+                    continue
 
-                    # Copy paragraph formatting
-                    new_para.alignment = para.alignment
+                if para._p.xpath(FOREIGN_REFERENCES_XPATH):
+                    # Images, hyperlinks, footnotes, comments and the like point
+                    # into parts of the source package, which the new document lacks
+                    copied.append(self._copy_paragraph_runs(para, target_doc)._p)
+                else:
+                    # Copy the whole <w:p>, keeping all paragraph and run formatting
+                    copied.append(target_body._insert_p(deepcopy(para._p)))
 
-            # Renumber subsections if needed
-            self._renumber_subsections(target_doc, chapter_info['chapter_number'])
+            # Renumber this chapter's subsections if needed
+            self._renumber_subsections(copied, chapter_info.chapter_number)
 
         except Exception as e:
             self.logger.error(f"Error copying chapter content: {str(e)}")
 
-    def _renumber_subsections(self, doc, chapter_number):
-        """Renumber subsections to match chapter number"""
+    def _copy_paragraph_runs(self, para, target_doc):
+        """Copy a paragraph's text runs and basic formatting to target document"""
+        # Create new paragraph in target document
+        new_para = target_doc.add_paragraph()
+
+        # Copy runs with formatting
+        for run in para.runs:
+            new_run = new_para.add_run(run.text)
+
+            # Copy run formatting
+            font = run.font
+            new_font = new_run.font
+            font_name = font.name
+            if font_name:
+                new_font.name = font_name
+            font_size = font.size
+            if font_size:
+                new_font.size = font_size
+            bold = run.bold
+            if bold:
+                new_run.bold = bold
+            italic = run.italic
+            if italic:
+                new_run.italic = italic
+
+        # Copy paragraph formatting
+        new_para.alignment = para.alignment
+
+        return new_para
+
+    def _renumber_subsections(self, paragraphs, chapter_number):
+        """Renumber subsections in a chapter's <w:p> elements to match chapter number"""
         try:
             subsection_counter = 1
 
             # Find paragraphs that need renumbering
-            for para in doc.paragraphs:
-                text = para.text.strip()
+            for p in paragraphs:
+                runs = list(p.iterchildren(W_R))
+                text = ''.join([r.text for r in runs]).strip()
 
                 # Match subsection patterns (1.1, 1.2, etc.)
-                subsection_match = re.match(r'(\d+)\.(\d+)\s+(.+)', text)
+                subsection_match = RENUMBER_RE.match(text)
                 if subsection_match:
                     current_chapter = int(subsection_match.group(1))
                     subsection_title = subsection_match.group(3)
@@ -274,11 +394,17 @@ class DocumentRestructurer:
                     if current_chapter != chapter_number:
                         new_text = f"{chapter_number}.{subsection_counter} {subsection_title}"
 
-                        # Clear paragraph and add corrected text
-                        para.clear()
-                        run = para.add_run(new_text)
-                        run.font.name = 'Times New Roman'
-                        run.font.size = Pt(12)
+                        # Put the corrected text in the first run with text,
+                        # keeping its formatting, and drop the remaining runs
+                        # and the run's other content (tabs, breaks, text)
+                        first_run = next(r for r in runs if r.text)
+                        for r in runs:
+                            if r is not first_run:
+                                p.remove(r)
+                        for child in list(first_run):
+                            if child.tag != W_RPR:
+                                first_run.remove(child)
+                        first_run.add_t(new_text)
 
                         subsection_counter += 1
 
@@ -304,6 +430,7 @@ class DocumentRestructurer:
 
             # Save document
             doc.save(restructured_path)
+            invalidate_document(restructured_path)
 
             self.logger.info(f"Restructured document saved: {restructured_path}")
             return restructured_path
@@ -314,6 +441,10 @@ class DocumentRestructurer:
 
     def _roman_to_int(self, roman):
         """Convert roman numeral to integer"""
+        value = ROMAN_TO_INT.get(roman)
+        if value is not None:
+            return value
+
         roman_numerals = {'I': 1, 'V': 5, 'X': 10}
         result = 0
         prev_value = 0
@@ -330,6 +461,9 @@ class DocumentRestructurer:
 
     def _int_to_roman(self, num):
         """Convert integer to roman numeral"""
+        if 0 <= num < len(INT_TO_ROMAN):
+            return INT_TO_ROMAN[num]
+
         values = [10, 9, 5, 4, 1]
         literals = ['X', 'IX', 'V', 'IV', 'I']
 
@@ -359,25 +493,28 @@ class DocumentRestructurer:
 
             for chapter in analysis['chapters']:
                 current_order.append({
-                    'roman': chapter['roman_numeral'],
-                    'title': chapter['title'],
-                    'number': chapter['chapter_number']
+                    'roman': chapter.roman_numeral,
+                    'title': chapter.title,
+                    'number': chapter.chapter_number
                 })
 
-            sorted_chapters = sorted(analysis['chapters'], key=lambda x: x['chapter_number'])
+            sorted_chapters = sorted(analysis['chapters'], key=attrgetter('chapter_number'))
             for chapter in sorted_chapters:
                 corrected_order.append({
-                    'roman': self._int_to_roman(chapter['chapter_number']),
-                    'title': chapter['title'],
-                    'number': chapter['chapter_number']
+                    'roman': self._int_to_roman(chapter.chapter_number),
+                    'title': chapter.title,
+                    'number': chapter.chapter_number
                 })
 
             return {
                 'preview_available': True,
                 'current_order': current_order,
                 'corrected_order': corrected_order,
-                'changes_needed': len([ch for ch in analysis['chapters']]),
-                'structure_issues': analysis['structure_issues']
+                'changes_needed': len(analysis['chapters']),
+                'structure_issues': analysis['structure_issues'],
+                # Kept as analyzed so it can be passed back to restructure_document;
+                # use serialize_analysis() to turn it into JSON-ready dicts
+                'analysis': analysis
             }
 
         except Exception as e:
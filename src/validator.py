@@ -1,10 +1,70 @@
 import re
+import hashlib
 import logging
+import threading
+from collections import Counter, OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
+from operator import attrgetter
 from datetime import datetime
-from docx import Document
 from docx.shared import Inches, Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+from docx.text.run import Run
 from .document_restructurer import DocumentRestructurer
+from .doc_cache import get_cached_document
+
+# Chapter heading format, numbers at a sentence start, and decimals written with a dot
+BAB_HEADING_RE = re.compile(r'BAB [IVX]+ ')
+# Every casing of 'BAB ', so headings are found without upper-casing each paragraph
+CHAPTER_PREFIXES = tuple(f'{b}{a}{b2} ' for b in 'Bb' for a in 'Aa' for b2 in 'Bb')
+FIRST_SENTENCE_NUMBER_RE = re.compile(r'\s*(\d)')
+SENTENCE_NUMBER_RE = re.compile(r'\. \s*(\d)')
+# Only tested for presence: a digit, a dot and a digit appear exactly when the
+# longer '\d+\.\d+' form does, without retrying over every digit of a long run
+DECIMAL_DOT_RE = re.compile(r'\d\.\d')
+
+W_P = qn('w:p')
+W_R = qn('w:r')
+
+# Fields shared by every violation of a kind; nested corrections are read-only
+MARGIN_VIOLATION = {'type': 'margin_error', 'severity': 'error', 'auto_correctable': True}
+NUMBER_START_VIOLATION = {'type': 'number_start_sentence', 'severity': 'warning', 'auto_correctable': False}
+DECIMAL_SEPARATOR_VIOLATION = {
+    'type': 'decimal_separator',
+    'severity': 'warning',
+    'message': 'Use comma (,) as decimal separator, not period (.)',
+    'auto_correctable': True,
+    'correction': {'type': 'decimal_separator', 'replace_dots_with_commas': True}
+}
+
+# Violation types reported when a check itself fails rather than finding a problem
+CHECK_FAILURE_TYPES = {
+    'page_setup_error',
+    'typography_error',
+    'structure_validation_error',
+    'document_order_validation_error',
+    'heading_validation_error',
+    'table_figure_validation_error',
+    'text_formatting_error'
+}
+
+# Maximum number of validation results kept per validator
+MAX_CACHED_VALIDATIONS = 16
+
+
+@dataclass(slots=True)
+class ParagraphFacts:
+    """Text and formatting of one body paragraph, read once for all validators"""
+    index: int
+    text: str
+    stripped: str
+    upper: str  # Only filled for chapter headings, empty otherwise
+    runs: list  # (font name, font size) per run; only read for non-empty paragraphs
+    line_spacing: object = None
+    alignment: object = None  # Only read for chapter headings
+    first_run_bold: object = None  # Only read for chapter headings
 
 class DocumentValidator:
     """Validates documents against UNISMUH formatting rules"""
@@ -13,104 +73,172 @@ class DocumentValidator:
         self.config = config
         self.rules = config['validation_rules']
         self.logger = logging.getLogger(__name__)
-        self.restructurer = DocumentRestructurer(config)
+        self._restructurer = None
+
+        # Required sections, upper-cased once for heading comparisons
+        self._required_sections_upper = [
+            section.upper() for section in config['document_types']['proposal']['required_sections']
+        ]
+
+        # Expected page and typography values, parsed from the config once
+        expected_margins = config['page_setup']['margins']
+        self._margin_specs = [
+            (side, attrgetter(f'{side}_margin'), float(expected_margins[side].replace('cm', '')))
+            for side in ('top', 'bottom', 'left', 'right')
+        ]
+        body_font = config['typography']['body_font']
+        self._expected_font = body_font['family']
+        self._expected_size = int(body_font['size'].replace('pt', ''))
+        self._expected_spacing = config['typography']['line_spacing']['body_text']
+
+        # Stop at the first check that fails outright instead of running the rest
+        self._fast_fail = config.get('validation', {}).get('fast_fail', False)
+
+        # Violations by file content hash, so unchanged files are not revalidated
+        self._validation_cache = OrderedDict()
+        self._validation_lock = threading.Lock()
+
+    @property
+    def restructurer(self):
+        """Restructurer used for the chapter order check, created on first use"""
+        if self._restructurer is None:
+            self._restructurer = DocumentRestructurer(self.config)
+        return self._restructurer
 
     def validate_document(self, document_path):
         """Validate entire document and return list of violations"""
         violations = []
 
         try:
-            doc = Document(document_path)
+            content_hash = self._content_hash(document_path)
+            with self._validation_lock:
+                cached = self._validation_cache.get(content_hash)
+                if cached is not None:
+                    self._validation_cache.move_to_end(content_hash)
+                    return deepcopy(cached)
+
+            doc = get_cached_document(document_path)
+
+            # Walk the paragraphs once; the paragraph validators share the result.
+            # The checks below are plain Python over these facts and hold the
+            # GIL, so they run in sequence: a thread pool measured no faster
+            paragraphs = self._collect_paragraph_facts(doc)
+
+            checks = [
+                (self._validate_page_setup, doc),  # Validate page setup
+                (self._validate_typography, paragraphs),  # Validate typography
+                (self._validate_structure, paragraphs),  # Validate document structure
+                (self._validate_document_order, doc),  # Check for structural issues that need restructuring
+                (self._validate_headings, paragraphs),  # Validate headings
+                (self._validate_tables_figures, doc),  # Validate tables and figures
+                (self._validate_text_formatting, paragraphs),  # Validate text formatting
+            ]
+
+            for check, target in checks:
+                check_violations = check(target)
+                violations.extend(check_violations)
+
+                # A check that failed outright usually means the document is
+                # corrupt or unsupported; optionally skip the remaining checks
+                if self._fast_fail and any(v['type'] in CHECK_FAILURE_TYPES for v in check_violations):
+                    self.logger.warning(f"Validation stopped early after {check.__name__} failed")
+                    break
 
-            # Validate page setup
-            violations.extend(self._validate_page_setup(doc))
-
-            # Validate typography
-            violations.extend(self._validate_typography(doc))
-
-            # Validate document structure
-            violations.extend(self._validate_structure(doc))
-
-            # Check for structural issues that need restructuring
-            violations.extend(self._validate_document_order(document_path))
-
-            # Validate headings
-            violations.extend(self._validate_headings(doc))
-
-            # Validate tables and figures
-            violations.extend(self._validate_tables_figures(doc))
+            self.logger.info(f"Document validation completed: {len(violations)} violations found")
 
-            # Validate text formatting
-            violations.extend(self._validate_text_formatting(doc))
+            with self._validation_lock:
+                self._validation_cache[content_hash] = deepcopy(violations)
+                while len(self._validation_cache) > MAX_CACHED_VALIDATIONS:
+                    self._validation_cache.popitem(last=False)
 
-            self.logger.info(f"Document validation completed: {len(violations)} violations found")
             return violations
 
         except Exception as e:
             self.logger.error(f"Error during validation: {str(e)}")
             return [{'type': 'system_error', 'message': f'Validation error: {str(e)}', 'severity': 'error'}]
 
+    def _content_hash(self, document_path):
+        """Hash the file bytes; identical uploads share one validation result"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(document_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.digest()
+
+    def _collect_paragraph_facts(self, doc):
+        """Read each body paragraph's text and formatting in a single pass"""
+        facts = []
+
+        # Walk the same <w:p> and <w:r> elements as doc.paragraphs and
+        # paragraph.runs, reading each run once for both text and font, and
+        # only wrap the paragraphs whose formatting is actually checked
+        for para_idx, p in enumerate(doc.element.body.iterchildren(W_P)):
+            runs = list(p.iterchildren(W_R))
+            text = ''.join([r.text for r in runs])
+            stripped = text.strip()
+            upper = stripped.upper() if stripped.startswith(CHAPTER_PREFIXES) else ''
+            paragraph_facts = ParagraphFacts(para_idx, text, stripped, upper, [])
+
+            # Empty paragraphs are only ever checked for their text
+            if stripped:
+                run_fonts = []
+                for r in runs:
+                    rPr = r.rPr
+                    run_fonts.append((None, None) if rPr is None else (rPr.rFonts_ascii, rPr.sz_val))
+                paragraph_facts.runs = run_fonts
+
+                paragraph = Paragraph(p, doc)
+                paragraph_facts.line_spacing = paragraph.paragraph_format.line_spacing
+
+                if upper:
+                    paragraph_facts.alignment = paragraph.alignment
+                    if runs:
+                        paragraph_facts.first_run_bold = Run(runs[0], paragraph).bold
+
+            facts.append(paragraph_facts)
+
+        return facts
+
     def _validate_page_setup(self, doc):
         """Validate page margins, size, and orientation"""
         violations = []
 
         try:
-            sections = doc.sections
-            for section_idx, section in enumerate(sections):
-                # Check margins
-                expected_margins = self.config['page_setup']['margins']
-
-                top_margin_cm = section.top_margin.cm
-                bottom_margin_cm = section.bottom_margin.cm
-                left_margin_cm = section.left_margin.cm
-                right_margin_cm = section.right_margin.cm
-
-                # Convert expected margins (remove 'cm' suffix)
-                expected_top = float(expected_margins['top'].replace('cm', ''))
-                expected_bottom = float(expected_margins['bottom'].replace('cm', ''))
-                expected_left = float(expected_margins['left'].replace('cm', ''))
-                expected_right = float(expected_margins['right'].replace('cm', ''))
+            tolerance = 0.2  # Allow 2mm tolerance
 
-                tolerance = 0.2  # Allow 2mm tolerance
+            for section_idx, section in enumerate(doc.sections):
+                location = f'Section {section_idx + 1}'
 
-                if abs(top_margin_cm - expected_top) > tolerance:
-                    violations.append({
-                        'type': 'margin_error',
-                        'severity': 'error',
-                        'message': f'Top margin is {top_margin_cm:.1f}cm but should be {expected_top}cm according to UNISMUH guidelines',
-                        'location': f'Section {section_idx + 1}',
-                        'auto_correctable': True,
-                        'correction': {'type': 'margin', 'margin': 'top', 'value': expected_top}
-                    })
-
-                if abs(bottom_margin_cm - expected_bottom) > tolerance:
-                    violations.append({
-                        'type': 'margin_error',
-                        'severity': 'error',
-                        'message': f'Bottom margin is {bottom_margin_cm:.1f}cm but should be {expected_bottom}cm according to UNISMUH guidelines',
-                        'location': f'Section {section_idx + 1}',
-                        'auto_correctable': True,
-                        'correction': {'type': 'margin', 'margin': 'bottom', 'value': expected_bottom}
-                    })
-
-                if abs(left_margin_cm - expected_left) > tolerance:
+                # Check margins
+                wrong_margins = []
+                for side, get_margin, expected in self._margin_specs:
+                    actual = get_margin(section).cm
+                    if abs(actual - expected) > tolerance:
+                        wrong_margins.append((side, actual, expected))
+
+                if len(wrong_margins) == 1:
+                    side, actual, expected = wrong_margins[0]
                     violations.append({
-                        'type': 'margin_error',
-                        'severity': 'error',
-                        'message': f'Left margin is {left_margin_cm:.1f}cm but should be {expected_left}cm according to UNISMUH guidelines',
-                        'location': f'Section {section_idx + 1}',
-                        'auto_correctable': True,
-                        'correction': {'type': 'margin', 'margin': 'left', 'value': expected_left}
+                        **MARGIN_VIOLATION,
+                        'message': f'{side.capitalize()} margin is {actual:.1f}cm but should be {expected}cm according to UNISMUH guidelines',
+                        'location': location,
+                        'correction': {'type': 'margin', 'margin': side, 'value': expected}
                     })
-
-                if abs(right_margin_cm - expected_right) > tolerance:
+                elif wrong_margins:
+                    # Several wrong margins (typically a default page setup) are
+                    # reported and corrected together
+                    details = ', '.join(
+                        f'{side} is {actual:.1f}cm but should be {expected}cm'
+                        for side, actual, expected in wrong_margins
+                    )
                     violations.append({
-                        'type': 'margin_error',
-                        'severity': 'error',
-                        'message': f'Right margin is {right_margin_cm:.1f}cm but should be {expected_right}cm according to UNISMUH guidelines',
-                        'location': f'Section {section_idx + 1}',
-                        'auto_correctable': True,
-                        'correction': {'type': 'margin', 'margin': 'right', 'value': expected_right}
+                        **MARGIN_VIOLATION,
+                        'message': f'Margins do not follow UNISMUH guidelines: {details}',
+                        'location': location,
+                        'correction': {
+                            'type': 'margins',
+                            'values': {side: expected for side, _, expected in wrong_margins}
+                        }
                     })
 
         except Exception as e:
@@ -123,50 +251,62 @@ class DocumentValidator:
 
         return violations
 
-    def _validate_typography(self, doc):
+    def _validate_typography(self, paragraphs):
         """Validate font, size, and line spacing"""
         violations = []
 
         try:
-            expected_font = self.config['typography']['body_font']['family']
-            expected_size = int(self.config['typography']['body_font']['size'].replace('pt', ''))
-
-            for para_idx, paragraph in enumerate(doc.paragraphs):
-                if paragraph.text.strip():  # Skip empty paragraphs
-                    for run in paragraph.runs:
-                        if run.font.name and run.font.name != expected_font:
+            expected_font = self._expected_font
+            expected_size = self._expected_size
+            expected_spacing = self._expected_spacing
+
+            # Fields shared by every violation of each kind
+            font_violation = {
+                'type': 'font_error', 'severity': 'error', 'auto_correctable': True,
+                'correction': {'type': 'font', 'font_name': expected_font}
+            }
+            font_size_violation = {
+                'type': 'font_size_error', 'severity': 'error', 'auto_correctable': True,
+                'correction': {'type': 'font_size', 'size': expected_size}
+            }
+            line_spacing_violation = {
+                'type': 'line_spacing_error', 'severity': 'error', 'auto_correctable': True,
+                'correction': {'type': 'line_spacing', 'spacing': expected_spacing}
+            }
+
+            for paragraph in paragraphs:
+                if paragraph.stripped:  # Skip empty paragraphs
+                    location = f'Paragraph {paragraph.index + 1}'
+
+                    # Report each wrong font and size once per paragraph, not once per run
+                    reported_fonts = set()
+                    reported_sizes = set()
+                    for font_name, font_size in paragraph.runs:
+                        if font_name and font_name != expected_font and font_name not in reported_fonts:
+                            reported_fonts.add(font_name)
                             violations.append({
-                                'type': 'font_error',
-                                'severity': 'error',
-                                'message': f'{run.font.name} font used instead of required {expected_font}',
-                                'location': f'Paragraph {para_idx + 1}',
-                                'auto_correctable': True,
-                                'correction': {'type': 'font', 'font_name': expected_font}
+                                **font_violation,
+                                'message': f'{font_name} font used instead of required {expected_font}',
+                                'location': location
                             })
 
-                        if run.font.size and run.font.size.pt != expected_size:
+                        if font_size and font_size.pt != expected_size and font_size not in reported_sizes:
+                            reported_sizes.add(font_size)
                             violations.append({
-                                'type': 'font_size_error',
-                                'severity': 'error',
-                                'message': f'Font size {run.font.size.pt}pt used instead of required {expected_size}pt',
-                                'location': f'Paragraph {para_idx + 1}',
-                                'auto_correctable': True,
-                                'correction': {'type': 'font_size', 'size': expected_size}
+                                **font_size_violation,
+                                'message': f'Font size {font_size.pt}pt used instead of required {expected_size}pt',
+                                'location': location
                             })
 
                     # Check line spacing
-                    if paragraph.paragraph_format.line_spacing:
-                        current_spacing = paragraph.paragraph_format.line_spacing
-                        expected_spacing = self.config['typography']['line_spacing']['body_text']
+                    if paragraph.line_spacing:
+                        current_spacing = paragraph.line_spacing
 
                         if abs(current_spacing - expected_spacing) > 0.1:
                             violations.append({
-                                'type': 'line_spacing_error',
-                                'severity': 'error',
+                                **line_spacing_violation,
                                 'message': f'{current_spacing} spacing used instead of required {expected_spacing} line spacing',
-                                'location': f'Paragraph {para_idx + 1}',
-                                'auto_correctable': True,
-                                'correction': {'type': 'line_spacing', 'spacing': expected_spacing}
+                                'location': location
                             })
 
         except Exception as e:
@@ -179,29 +319,22 @@ class DocumentValidator:
 
         return violations
 
-    def _validate_structure(self, doc):
+    def _validate_structure(self, paragraphs):
         """Validate document structure and required sections"""
         violations = []
 
         try:
-            # Extract chapter headings
-            chapter_headings = []
-            for paragraph in doc.paragraphs:
-                text = paragraph.text.strip().upper()
-                if text.startswith('BAB '):
-                    chapter_headings.append(text)
+            # Extract chapter headings, and the plain texts for the subsection scans.
+            # Section names never contain a newline, so a substring test on the
+            # joined headings finds the same matches as testing each heading
+            headings_blob = '\n'.join(p.upper for p in paragraphs if p.upper)
+            texts = [p.text for p in paragraphs]
 
             # Check required sections
             required_sections = self.config['document_types']['proposal']['required_sections']
 
-            for required_section in required_sections:
-                found = False
-                for heading in chapter_headings:
-                    if required_section.upper() in heading:
-                        found = True
-                        break
-
-                if not found:
+            for required_section, required_upper in zip(required_sections, self._required_sections_upper):
+                if required_upper not in headings_blob:
                     violations.append({
                         'type': 'structure_error',
                         'severity': 'error',
@@ -211,21 +344,34 @@ class DocumentValidator:
                     })
 
             # Check subsections for each chapter
-            for chapter, subsections in self.config['document_types']['proposal']['subsections'].items():
-                chapter_found = any(chapter.upper() in heading for heading in chapter_headings)
-
-                if chapter_found:
-                    for subsection in subsections:
-                        subsection_found = any(subsection in paragraph.text
-                                             for paragraph in doc.paragraphs)
-                        if not subsection_found:
-                            violations.append({
-                                'type': 'subsection_missing',
-                                'severity': 'warning',
-                                'message': f'Missing subsection \'{subsection}\' in {chapter}',
-                                'location': chapter,
-                                'auto_correctable': False
-                            })
+            subsections_by_chapter = [
+                (chapter, subsections)
+                for chapter, subsections in self.config['document_types']['proposal']['subsections'].items()
+                if chapter.upper() in headings_blob
+            ]
+
+            # Sweep the texts once for every required subsection, dropping
+            # each one as soon as it is found
+            missing_subsections = {
+                subsection for _, subsections in subsections_by_chapter for subsection in subsections
+            }
+            for text in texts:
+                if not missing_subsections:
+                    break
+                missing_subsections.difference_update(
+                    [subsection for subsection in missing_subsections if subsection in text]
+                )
+
+            for chapter, subsections in subsections_by_chapter:
+                for subsection in subsections:
+                    if subsection in missing_subsections:
+                        violations.append({
+                            'type': 'subsection_missing',
+                            'severity': 'warning',
+                            'message': f'Missing subsection \'{subsection}\' in {chapter}',
+                            'location': chapter,
+                            'auto_correctable': False
+                        })
 
         except Exception as e:
             violations.append({
@@ -237,16 +383,17 @@ class DocumentValidator:
 
         return violations
 
-    def _validate_headings(self, doc):
+    def _validate_headings(self, paragraphs):
         """Validate heading formats and styles"""
         violations = []
 
         try:
-            for para_idx, paragraph in enumerate(doc.paragraphs):
-                text = paragraph.text.strip()
+            for paragraph in paragraphs:
+                text = paragraph.stripped
+                para_idx = paragraph.index
 
                 # Check chapter headings
-                if text.upper().startswith('BAB '):
+                if paragraph.upper:
                     # Should be centered and bold
                     if paragraph.alignment != WD_ALIGN_PARAGRAPH.CENTER:
                         violations.append({
@@ -259,7 +406,7 @@ class DocumentValidator:
                         })
 
                     # Check if bold (check first run)
-                    if paragraph.runs and not paragraph.runs[0].bold:
+                    if paragraph.runs and not paragraph.first_run_bold:
                         violations.append({
                             'type': 'heading_bold',
                             'severity': 'error',
@@ -270,7 +417,7 @@ class DocumentValidator:
                         })
 
                     # Check format (BAB [ROMAN] [TITLE])
-                    if not re.match(r'BAB [IVX]+ ', text.upper()):
+                    if not BAB_HEADING_RE.match(paragraph.upper):
                         violations.append({
                             'type': 'heading_format',
                             'severity': 'warning',
@@ -295,15 +442,19 @@ class DocumentValidator:
 
         try:
             # Validate tables
-            for table_idx, table in enumerate(doc.tables):
-                # Check if table has a title (look at paragraph before table)
-                # This is simplified - in practice you'd need more sophisticated detection
+            # Title detection is not implemented yet, so ask once for all
+            # tables instead of repeating the same suggestion per table
+            table_count = len(doc.tables)
+            if table_count:
+                tables = f'Tables 1-{table_count}' if table_count > 1 else 'Table 1'
+                verb = 'have' if table_count > 1 else 'has'
                 violations.append({
                     'type': 'table_title_check',
                     'severity': 'suggestion',
-                    'message': f'Verify that Table {table_idx + 1} has proper title format "Tabel [NUMBER]. [Title]"',
-                    'location': f'Table {table_idx + 1}',
-                    'auto_correctable': False
+                    'message': f'Verify that {tables} {verb} proper title format "Tabel [NUMBER]. [Title]"',
+                    'location': tables,
+                    'auto_correctable': False,
+                    'table_indices': list(range(1, table_count + 1))
                 })
 
         except Exception as e:
@@ -316,38 +467,41 @@ class DocumentValidator:
 
         return violations
 
-    def _validate_text_formatting(self, doc):
+    def _validate_text_formatting(self, paragraphs):
         """Validate text-specific formatting rules"""
         violations = []
 
         try:
-            for para_idx, paragraph in enumerate(doc.paragraphs):
+            for paragraph in paragraphs:
                 text = paragraph.text
-
-                # Check for numbers at start of sentences
-                sentences = text.split('. ')
-                for sentence_idx, sentence in enumerate(sentences):
-                    sentence = sentence.strip()
-                    if re.match(r'^\d+', sentence):
-                        violations.append({
-                            'type': 'number_start_sentence',
-                            'severity': 'warning',
-                            'message': f'Number at sentence start should be written as words: "{sentence[:20]}..."',
-                            'location': f'Paragraph {para_idx + 1}, Sentence {sentence_idx + 1}',
-                            'auto_correctable': False
-                        })
-
-                # Check decimal and thousand separators
-                if re.search(r'\d+\.\d+', text):  # Decimal with dot
+                para_idx = paragraph.index
+
+                # Check for numbers at start of sentences; sentences are
+                # separated by '. ' and leading whitespace is ignored. The first
+                # sentence is matched on its own so the scan for the others is
+                # led by the literal separator and can skip ahead to it
+                matches = []
+                first_match = FIRST_SENTENCE_NUMBER_RE.match(text)
+                if first_match:
+                    matches.append(first_match)
+                if '. ' in text:
+                    matches.extend(SENTENCE_NUMBER_RE.finditer(text))
+
+                for match in matches:
+                    start = match.start(1)
+                    end = text.find('. ', start)
+                    sentence = text[start:end if end != -1 else len(text)].rstrip()
+                    sentence_number = text.count('. ', 0, start) + 1
                     violations.append({
-                        'type': 'decimal_separator',
-                        'severity': 'warning',
-                        'message': 'Use comma (,) as decimal separator, not period (.)',
-                        'location': f'Paragraph {para_idx + 1}',
-                        'auto_correctable': True,
-                        'correction': {'type': 'decimal_separator', 'replace_dots_with_commas': True}
+                        **NUMBER_START_VIOLATION,
+                        'message': f'Number at sentence start should be written as words: "{sentence[:20]}..."',
+                        'location': f'Paragraph {para_idx + 1}, Sentence {sentence_number}'
                     })
 
+                # Check decimal and thousand separators
+                if DECIMAL_DOT_RE.search(text):  # Decimal with dot
+                    violations.append({**DECIMAL_SEPARATOR_VIOLATION, 'location': f'Paragraph {para_idx + 1}'})
+
         except Exception as e:
             violations.append({
                 'type': 'text_formatting_error',
@@ -358,18 +512,20 @@ class DocumentValidator:
 
         return violations
 
-    def _validate_document_order(self, document_path):
+    def _validate_document_order(self, doc):
         """Validate document chapter order and structure using restructurer"""
         violations = []
 
         try:
             # Use restructurer to analyze document structure
-            analysis = self.restructurer.analyze_document_structure(document_path)
+            analysis = self.restructurer.analyze_document_structure_from_doc(doc)
 
             # Add structure issues to violations
             violations.extend(analysis['structure_issues'])
 
-            # Add specific violation for reordering if needed
+            # Add specific violation for reordering if needed. The orders are
+            # built eagerly: the payload is serialised to JSON, so a lazily
+            # filled dict would drop them, and sorting a few chapters is cheap
             if analysis['reordering_needed']:
                 violations.append({
                     'type': 'document_reordering',
@@ -380,8 +536,8 @@ class DocumentValidator:
                     'correction': {
                         'type': 'document_restructure',
                         'action': 'reorder_chapters',
-                        'current_order': [ch['title'] for ch in analysis['chapters']],
-                        'correct_order': [ch['title'] for ch in sorted(analysis['chapters'], key=lambda x: x['chapter_number'])]
+                        'current_order': [ch.title for ch in analysis['chapters']],
+                        'correct_order': [ch.title for ch in sorted(analysis['chapters'], key=attrgetter('chapter_number'))]
                     }
                 })
 
@@ -400,11 +556,5 @@ class DocumentValidator:
 
     def get_severity_summary(self, violations):
         """Get summary of violations by severity"""
-        summary = {'error': 0, 'warning': 0, 'suggestion': 0}
-
-        for violation in violations:
-            severity = violation.get('severity', 'error')
-            if severity in summary:
-                summary[severity] += 1
-
-        return summary
\ No newline at end of file
+        counts = Counter(violation.get('severity', 'error') for violation in violations)
+        return {severity: counts[severity] for severity in ('error', 'warning', 'suggestion')}
\ No newline at end of file
@@ -123,6 +123,28 @@ const handleFileUpload = async (file) => {
     return await response.json();
 };
 
+// Poll processing status until the uploaded document has been processed
+const waitForProcessing = async (fileId, interval = 1000) => {
+    while (true) {
+        const status = await apiCall(`/status/${fileId}`);
+
+        if (status.status === 'completed') {
+            if (!status.result) {
+                throw new Error('Processing result is no longer available, please upload the document again');
+            }
+            return status.result;
+        }
+        if (status.status === 'failed') {
+            throw new Error(status.error || 'Processing failed');
+        }
+        if (status.status === 'not_found') {
+            throw new Error('Document not found');
+        }
+
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+};
+
 // Document validation
 const validateDocument = async (fileId) => {
     return await apiCall(`/validate/${fileId}`);
@@ -367,7 +389,9 @@ const handleAutoCorrect = async () => {
 
         const result = await correctDocument(currentFileId, autoCorrectableViolations);
 
-        showToast(`${result.corrections_applied.length} koreksi berhasil diterapkan`, 'success');
+        // Each applied entry summarizes every change of one correction type
+        const appliedCount = result.corrections_applied.reduce((total, c) => total + (c.count || 1), 0);
+        showToast(`${appliedCount} koreksi berhasil diterapkan`, 'success');
 
         if (result.corrections_failed.length > 0) {
             showToast(`${result.corrections_failed.length} koreksi gagal diterapkan`, 'warning');
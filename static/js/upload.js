@@ -159,8 +159,11 @@ document.addEventListener('DOMContentLoaded', () => {
             // Show processing message
             updateProgress(100, 'Memproses dokumen...');
 
+            // Wait for background processing to finish
+            const processingResult = await waitForProcessing(currentFileId);
+
             // Perform validation
-            const docInfo = uploadResult.result.document_info;
+            const docInfo = processingResult.document_info;
             document.getElementById('documentInfo').innerHTML = renderDocumentInfo(docInfo);
 
             await performValidation(currentFileId);
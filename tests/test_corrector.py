@@ -0,0 +1,58 @@
+import os
+import unittest
+from collections import Counter, defaultdict
+
+import yaml
+from docx import Document
+
+from src.corrector import DocumentCorrector
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'formatting_rules.yaml')
+
+
+def load_config():
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+class DecimalSeparatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mutate = DocumentCorrector(load_config())._make_decimal_separator_mutator()
+        self.doc = Document()
+
+    def fix(self, paragraph):
+        tally = defaultdict(Counter)
+        self.mutate(paragraph, tally)
+        return paragraph.text
+
+    def test_decimal_split_across_runs_is_fixed(self):
+        paragraph = self.doc.add_paragraph('Nilai 50')
+        paragraph.add_run('.5 persen')
+
+        self.assertEqual(self.fix(paragraph), 'Nilai 50,5 persen')
+
+    def test_dot_before_tab_or_break_is_kept(self):
+        tabbed = self.doc.add_paragraph()
+        run = tabbed.add_run('Tabel 4.')
+        run.add_tab()
+        run.add_text('1')
+        broken = self.doc.add_paragraph()
+        run = broken.add_run('2.')
+        run.add_break()
+        run.add_text('5')
+
+        self.assertEqual(self.fix(tabbed), 'Tabel 4.\t1')
+        self.assertEqual(self.fix(broken), '2.\n5')
+
+    def test_decimal_after_tab_is_fixed(self):
+        paragraph = self.doc.add_paragraph()
+        run = paragraph.add_run('Rata-rata')
+        run.add_tab()
+        run.add_text('3.14')
+
+        self.assertEqual(self.fix(paragraph), 'Rata-rata\t3,14')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+from docx import Document
+
+from src.doc_cache import get_cached_document
+from src.document_restructurer import DocumentRestructurer
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config', 'formatting_rules.yaml'))
+
+
+def load_config():
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def add_split_paragraph(doc, before, after, separator):
+    """Add a paragraph whose two halves are separated by a tab or a soft line break"""
+    paragraph = doc.add_paragraph()
+    run = paragraph.add_run(before)
+    if separator == 'tab':
+        run.add_tab()
+    else:
+        run.add_break()
+    paragraph.add_run(after)
+    return paragraph
+
+
+class AnalyzeDocumentStructureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.restructurer = DocumentRestructurer(load_config())
+
+    def test_headings_with_tabs_and_breaks_are_detected(self):
+        doc = Document()
+        add_split_paragraph(doc, 'BAB II', 'TINJAUAN PUSTAKA', 'break')
+        add_split_paragraph(doc, '2.1', 'Landasan Teori', 'tab')
+        add_split_paragraph(doc, 'BAB I', 'PENDAHULUAN', 'tab')
+        doc.add_paragraph('1.1 Latar Belakang')
+        doc.add_paragraph('BAB III METODE PENELITIAN')
+
+        analysis = self.restructurer.analyze_document_structure_from_doc(doc)
+
+        self.assertEqual([ch.chapter_number for ch in analysis['chapters']], [2, 1, 3])
+        self.assertEqual([ch.title for ch in analysis['chapters']],
+                         ['TINJAUAN PUSTAKA', 'PENDAHULUAN', 'METODE PENELITIAN'])
+        self.assertEqual([sub.number for sub in analysis['chapters'][0].subsections], ['2.1'])
+        self.assertTrue(analysis['reordering_needed'])
+        self.assertEqual(analysis['missing_sections'], [])
+
+    def test_caller_document_is_reanalyzed_after_changes(self):
+        doc = Document()
+        doc.add_paragraph('BAB I PENDAHULUAN')
+        first = self.restructurer.analyze_document_structure_from_doc(doc)
+
+        doc.add_paragraph('BAB II TINJAUAN PUSTAKA')
+        second = self.restructurer.analyze_document_structure_from_doc(doc)
+
+        self.assertEqual(len(first['chapters']), 1)
+        self.assertEqual(len(second['chapters']), 2)
+
+    def test_cached_document_analysis_is_reused(self):
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        document_path = os.path.join(workdir, 'thesis.docx')
+        doc = Document()
+        doc.add_paragraph('BAB I PENDAHULUAN')
+        doc.save(document_path)
+
+        cached = get_cached_document(document_path)
+
+        self.assertIs(self.restructurer.analyze_document_structure_from_doc(cached),
+                      self.restructurer.analyze_document_structure_from_doc(cached))
+
+
+class RenumberSubsectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.restructurer = DocumentRestructurer(load_config())
+
+    def test_tab_separated_subsection_is_renumbered_without_leftover_whitespace(self):
+        doc = Document()
+        paragraph = add_split_paragraph(doc, '3.1', 'Landasan', 'tab')
+        paragraph.runs[0].bold = True
+        paragraph.add_run(' Teori')
+
+        self.restructurer._renumber_subsections([paragraph._p], 2)
+
+        self.assertEqual(paragraph.text, '2.1 Landasan Teori')
+        self.assertEqual(len(paragraph.runs), 1)
+        self.assertTrue(paragraph.runs[0].bold)
+
+
+class RestructurePreviewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.restructurer = DocumentRestructurer(load_config())
+
+        # Restructured documents are saved under temp/ in the working directory
+        self.workdir = tempfile.mkdtemp()
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.workdir)
+        os.makedirs('temp')
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        shutil.rmtree(self.workdir)
+
+    def test_preview_analysis_can_be_passed_back_to_restructure(self):
+        doc = Document()
+        doc.add_paragraph('BAB II TINJAUAN PUSTAKA')
+        doc.add_paragraph('2.1 Landasan Teori')
+        doc.add_paragraph('BAB I PENDAHULUAN')
+        doc.add_paragraph('1.1 Latar Belakang')
+        doc.add_paragraph('BAB III METODE PENELITIAN')
+        document_path = os.path.join(self.workdir, 'abc_thesis.docx')
+        doc.save(document_path)
+
+        preview = self.restructurer.get_restructuring_preview(document_path)
+        self.assertTrue(preview['preview_available'])
+
+        result = self.restructurer.restructure_document(
+            document_path, {'reorder_chapters': True}, analysis=preview['analysis']
+        )
+
+        self.assertTrue(result['success'], result['message'])
+        self.assertEqual(result['corrected_order'],
+                         ['PENDAHULUAN', 'TINJAUAN PUSTAKA', 'METODE PENELITIAN'])
+        restructured = Document(result['restructured_file_path'])
+        self.assertEqual(restructured.paragraphs[0].text, 'BAB I PENDAHULUAN')
+
+
+if __name__ == '__main__':
+    unittest.main()
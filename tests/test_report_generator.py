@@ -0,0 +1,36 @@
+import os
+import unittest
+
+import yaml
+from docx import Document
+
+from src.report_generator import ReportGenerator
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'formatting_rules.yaml')
+
+
+def load_config():
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+class DocumentInfoTest(unittest.TestCase):
+
+    def test_words_separated_by_tabs_and_breaks_are_counted_separately(self):
+        doc = Document()
+        tabbed = doc.add_paragraph().add_run('Nilai')
+        tabbed.add_tab()
+        tabbed.add_text('rata-rata')
+        broken = doc.add_paragraph().add_run('Hasil')
+        broken.add_break()
+        broken.add_text('penelitian ini')
+        doc.add_paragraph('')
+
+        info = ReportGenerator(load_config())._get_document_info(doc)
+
+        self.assertEqual(info['paragraph_count'], 3)
+        self.assertEqual(info['estimated_word_count'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()